@@ -9,14 +9,159 @@ phone numbers, and other sensitive data with anonymized placeholders.
 
 import re
 import os
+import copy
+import mmap
+import functools
 import argparse
 from pathlib import Path
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, repeat
+from collections import defaultdict
+
+try:
+    import re2  # Optional: google-re2 provides linear-time matching
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan  # Optional: Hyperscan prefilters the combined scan
+except ImportError:
+    hyperscan = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Number of characters encoded and written to an output file at a time
+WRITE_BATCH_SIZE = 1 << 20
+
+# Every phone number and ID contains a digit
+DIGIT_PATTERN = re.compile(r'\d')
+ASCII_DIGITS = '0123456789'
+
+# The ASCII characters matched by the stdlib's \s; RE2's \s is narrower
+RE2_ASCII_SPACE = r'[\t\n\x0b\f\r\x1c-\x1f ]'
+
+def _read_text(file_path):
+    """Read a UTF-8 file through a read-only memory map"""
+    with open(file_path, 'rb') as f:
+        # Empty files cannot be memory mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, 'utf-8')
+
+def _has_digit(text):
+    """Return whether text contains any decimal digit"""
+    # Substring searches for ASCII digits are much faster than the pattern,
+    # which is only needed for digits from other scripts
+    if any(digit in text for digit in ASCII_DIGITS):
+        return True
+    return not text.isascii() and DIGIT_PATTERN.search(text) is not None
+
+def _write_pieces(output_path, pieces):
+    """Write text pieces to a file as UTF-8, in large unbuffered batches"""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(output_path, flags, 0o666)
+    try:
+        batch = []
+        batch_size = 0
+        for piece in pieces:
+            batch.append(piece)
+            batch_size += len(piece)
+            if batch_size >= WRITE_BATCH_SIZE:
+                _write_all(fd, ''.join(batch).encode('utf-8'))
+                batch = []
+                batch_size = 0
+        _write_all(fd, ''.join(batch).encode('utf-8'))
+    finally:
+        os.close(fd)
+
+def _write_all(fd, data):
+    """Write all of data to a file descriptor, resuming after short writes"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+@functools.lru_cache(maxsize=None)
+def _build_specific_names_re(names, flags=0):
+    """Compile an alternation of the given full names"""
+    return re.compile('|'.join(map(re.escape, names)), flags)
+
+@functools.lru_cache(maxsize=None)
+def _build_common_names_re(names):
+    """Compile an alternation of the given standalone first names"""
+    # Names followed by a surname are skipped; a following email address is
+    # replaced itself, so it does not count as a surname
+    return re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, names)) + r')\b'
+        r'(?!\s+[A-Z](?![A-Za-z0-9._%+-]*@))'
+    )
+
+def _pattern_source(pattern):
+    """Return the source of a pattern, with its flags written inline"""
+    if isinstance(pattern, str):
+        return pattern
+    # The combined alternation is compiled without flags, so each pattern's
+    # own flags are kept as a scoped group that every engine understands
+    flags = ''.join(letter for flag, letter in ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'),
+                                                (re.DOTALL, 's'))
+                    if pattern.flags & flag)
+    return f'(?{flags}:{pattern.pattern})' if flags else pattern.pattern
+
+@functools.lru_cache(maxsize=None)
+def _build_combined_re(alternatives, engine):
+    """Compile (group name, pattern) pairs into one named-group alternation"""
+    return engine.compile(
+        '|'.join(f'(?P<{name}>{pattern})' for name, pattern in alternatives)
+    )
+
+@functools.lru_cache(maxsize=None)
+def _build_hyperscan_db(patterns):
+    """Compile a Hyperscan database reporting candidate matches of the patterns"""
+    # Word boundaries are not supported together with Unicode classes, so
+    # they are dropped: every real match is still reported, among extras.
+    # Hyperscan's \s lacks the separators \x1c-\x1f that the stdlib's has.
+    expressions = [pattern.replace(r'\b', '').replace(r'\s', r'[\s\x1c-\x1f]').encode('utf-8')
+                   for pattern in patterns]
+    flags = hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    db = hyperscan.Database()
+    try:
+        db.compile(expressions=expressions, ids=list(range(len(expressions))),
+                   elements=len(expressions), flags=[flags] * len(expressions))
+    except hyperscan.error as e:
+        logger.debug(f"Hyperscan prefilter disabled: {e}")
+        return None
+    return db
+
+def _char_offsets(data, spans):
+    """Convert (start, end) byte offsets into UTF-8 data to character offsets"""
+    chars = {}
+    previous = position = 0
+    for offset in sorted({offset for span in spans for offset in span}):
+        position += len(data[previous:offset].decode('utf-8'))
+        chars[offset] = position
+        previous = offset
+    return [(chars[start], chars[end]) for start, end in spans]
+
+def _file_identifier(path):
+    """Return the identifier used for a file's replacements"""
+    # Extract filename without extension to use as identifier
+    file_stem = path.stem
+    # Remove "deidentified_" prefix if it exists
+    if file_stem.startswith('deidentified_'):
+        file_stem = file_stem[13:]
+    return file_stem
+
 class PIIDeidentifier:
+    # Attributes that configure what is replaced. The scanning patterns are
+    # rebuilt when any of them changes, and worker processes rebuild an
+    # instance from them.
+    _SETTINGS = ('email_pattern', 'phone_patterns', 'specific_names',
+                 'common_names', 'id_patterns')
+    # Prefixes of the kinds whose matches always contain an '@' or a digit
+    _PREFILTERED_KINDS = ('email', 'id_', 'phone_')
+
     def __init__(self):
         # Email pattern - matches most common email formats
         self.email_pattern = re.compile(
@@ -25,9 +170,8 @@ class PIIDeidentifier:
         
         # Phone number patterns - Australian and international formats
         self.phone_patterns = [
-            re.compile(r'\+61\s?\d+\s?\d+\s?\d+'),  # +61 formats
+            re.compile(r'\+61\s?\d{1,4}\s?\d{3,4}\s?\d{3,}'),  # +61 formats
             re.compile(r'\b0\d{3}\s?\d{3}\s?\d{3}\b'),  # Australian mobile 0xxx xxx xxx
-            re.compile(r'\b\d{9,10}\b'),  # Simple 9-10 digit numbers
             re.compile(r'\b\(\d{2}\)\s?\d{4}\s?\d{4}\b'),  # (02) 1234 5678
             re.compile(r'\b0[2-9]\s?\d{4}\s?\d{4}\b'),  # Landline 0x xxxx xxxx
         ]
@@ -46,127 +190,304 @@ class PIIDeidentifier:
             'David', 'Lisa', 'Robert', 'Mary', 'William', 'Patricia'
         ]
         
-        # ID numbers and sensitive identifiers
+        # ID numbers and sensitive identifiers; a phone-formatted value after
+        # the label is replaced as part of the ID rather than as a phone
+        id_value = '(?:' + '|'.join(p.pattern for p in self.phone_patterns) + r'|\d+\b)'
         self.id_patterns = [
-            re.compile(r'\bID:\s*\d+\b'),
-            re.compile(r'\bMobile:\s*\d+\b'),
+            re.compile(rf'\bID:\s*{id_value}'),
+            re.compile(rf'\bMobile:\s*{id_value}'),
         ]
         
-        # Counter for generating unique replacements
-        self.email_counter = 1
-        self.name_counter = 1
-        self.phone_counter = 1
-        self.id_counter = 1
+        # Counters for generating unique replacements, per file identifier
+        self._phone_ctrs = defaultdict(lambda: count(1))
+        self._id_ctrs = defaultdict(lambda: count(1))
         
-        # Store mappings to ensure consistency
-        self.email_mappings = {}
+        # Store mappings to ensure consistency. They are kept per file
+        # identifier, so one instance can process many files and each file
+        # still gets its own replacements.
+        self.email_mappings = defaultdict(dict)
         self.name_mappings = {}
-        self.phone_mappings = {}
-        self.id_mappings = {}
+        self.phone_mappings = defaultdict(dict)
+        self.id_mappings = defaultdict(dict)
+        
+        self._compile_patterns()
+
+    def _settings_snapshot(self):
+        """Return copies of the settings, to detect later changes to them"""
+        return [copy.copy(getattr(self, name)) for name in self._SETTINGS]
+
+    def _pii_alternatives(self):
+        """Return the (group name, pattern) pairs of the combined PII scan"""
+        alternatives = [('email', self.email_pattern)]
+        alternatives += [(f'id_{i}', p) for i, p in enumerate(self.id_patterns)]
+        alternatives += [(f'phone_{i}', p) for i, p in enumerate(self.phone_patterns)]
+        return alternatives
+
+    def _compile_patterns(self):
+        """Build the combined scanning patterns from the configured ones"""
+        self._compiled_settings = self._settings_snapshot()
+        
+        # Each group of names is matched by one alternation, shared between
+        # instances. Names not written exactly as listed are found by matching
+        # the lowercased keys against the lowercased text.
+        self._specific_lower_names = [name.lower() for name in self.specific_names]
+        self._specific_lower_re = _build_specific_names_re(tuple(self._specific_lower_names))
+        self._specific_names_re = _build_specific_names_re(
+            tuple(self.specific_names), re.IGNORECASE
+        )
+        self._common_names_re = _build_common_names_re(tuple(self.common_names))
+        
+        # Combine email, ID and phone patterns into one alternation so a
+        # single scan finds every kind; the group name identifies the kind
+        alternatives = [(name, _pattern_source(pattern))
+                        for name, pattern in self._pii_alternatives()]
+        # Text without an '@' or a digit is only skipped when no other kind
+        # of PII could match it
+        self._prefilter_pii = all(name.startswith(self._PREFILTERED_KINDS)
+                                  for name, _ in alternatives)
+        # With Hyperscan, the combined pattern only runs where a match can start.
+        # The database is shared, but a scan needs scratch space that no other
+        # scan is using, so each instance allocates its own.
+        self._hyperscan_db = None
+        if hyperscan is not None:
+            self._hyperscan_db = _build_hyperscan_db(tuple(p for _, p in alternatives))
+        if self._hyperscan_db is not None:
+            self._hyperscan_scratch = hyperscan.Scratch(self._hyperscan_db)
+        self._combined = _build_combined_re(tuple(alternatives), re)
+        # Otherwise RE2 scans ASCII text in guaranteed linear time when
+        # installed. Its \b, \d and \s only know ASCII, so other text keeps
+        # the stdlib pattern, and \s is spelled out to match the same ASCII
+        # characters. RE2 is not used for the many short searches from
+        # Hyperscan candidates, as each RE2 call re-encodes the whole text.
+        self._combined_re2 = None
+        if re2 is not None and self._hyperscan_db is None:
+            self._combined_re2 = _build_combined_re(
+                tuple((name, pattern.replace(r'\s', RE2_ASCII_SPACE))
+                      for name, pattern in alternatives), re2
+            )
+
+    def _replace_email(self, email, file_identifier):
+        """Return the anonymized replacement for an email address"""
+        mappings = self.email_mappings[file_identifier]
+        replacement = mappings.get(email)
+        if replacement is None:
+            domain = email.split('@')[1]
+            if 'gmail.com' in domain:
+                replacement = f"{file_identifier}@gmail.com"
+            elif 'hotmail.com' in domain:
+                replacement = f"{file_identifier}@hotmail.com"
+            else:
+                replacement = f"{file_identifier}@example.com"
+            mappings[email] = replacement
+        return replacement
+
+    def _replace_phone(self, phone, file_identifier):
+        """Return the anonymized replacement for a phone number"""
+        mappings = self.phone_mappings[file_identifier]
+        replacement = mappings.get(phone)
+        if replacement is None:
+            # Generate a fake phone number maintaining format
+            n = next(self._phone_ctrs[file_identifier])
+            if phone.startswith('0'):
+                replacement = f"0XXX XXX {n:03d}"
+            elif '+61' in phone:
+                replacement = f"+61 XXX XXX {n:03d}"
+            else:
+                replacement = f"XXX XXX {n:03d}"
+            mappings[phone] = replacement
+        return replacement
+
+    def _replace_id(self, id_text, file_identifier):
+        """Return the anonymized replacement for an ID or identifier"""
+        mappings = self.id_mappings[file_identifier]
+        replacement = mappings.get(id_text)
+        if replacement is None:
+            n = next(self._id_ctrs[file_identifier])
+            if 'ID:' in id_text:
+                replacement = f"ID: {n:06d}"
+            elif 'Mobile:' in id_text:
+                replacement = f"Mobile: XXXX{n:03d}"
+            else:
+                replacement = f"ID_{n}"
+            mappings[id_text] = replacement
+        return replacement
+
+    def _replace_pii(self, kind, value, file_identifier):
+        """Dispatch a match of the combined pattern to its replacement logic"""
+        if kind == 'email':
+            return self._replace_email(value, file_identifier)
+        if kind.startswith('id_'):
+            return self._replace_id(value, file_identifier)
+        return self._replace_phone(value, file_identifier)
 
     def deidentify_emails(self, text, file_identifier="participant"):
         """Replace email addresses with anonymized versions using file identifier"""
-        def replace_email(match):
-            email = match.group(0)
-            if email not in self.email_mappings:
-                domain = email.split('@')[1]
-                if 'gmail.com' in domain:
-                    replacement = f"{file_identifier}@gmail.com"
-                elif 'hotmail.com' in domain:
-                    replacement = f"{file_identifier}@hotmail.com"
-                else:
-                    replacement = f"{file_identifier}@example.com"
-                self.email_mappings[email] = replacement
-            return self.email_mappings[email]
-        
-        return self.email_pattern.sub(replace_email, text)
-
-    def deidentify_phones(self, text):
+        return self.email_pattern.sub(
+            lambda match: self._replace_email(match.group(0), file_identifier), text
+        )
+
+    def deidentify_phones(self, text, file_identifier="participant"):
         """Replace phone numbers with anonymized versions"""
-        def replace_phone(match):
-            phone = match.group(0)
-            if phone not in self.phone_mappings:
-                # Generate a fake phone number maintaining format
-                if phone.startswith('0'):
-                    replacement = f"0XXX XXX {str(self.phone_counter).zfill(3)}"
-                elif '+61' in phone:
-                    replacement = f"+61 XXX XXX {str(self.phone_counter).zfill(3)}"
-                else:
-                    replacement = f"XXX XXX {str(self.phone_counter).zfill(3)}"
-                self.phone_mappings[phone] = replacement
-                self.phone_counter += 1
-            return self.phone_mappings[phone]
-        
         for pattern in self.phone_patterns:
-            text = pattern.sub(replace_phone, text)
+            text = pattern.sub(
+                lambda match: self._replace_phone(match.group(0), file_identifier), text
+            )
         return text
 
-    def deidentify_names(self, text, file_identifier="Participant"):
-        """Replace specific names with anonymized versions using file identifier"""
-        # Replace specific known full names first
-        for original_name in self.specific_names.keys():
-            text = re.sub(re.escape(original_name), file_identifier, text, flags=re.IGNORECASE)
-        
-        # Handle standalone first names
-        common_first_names = ['Zoe', 'James', 'Jason', 'John', 'Jane', 'Michael', 'Sarah', 
-                             'David', 'Lisa', 'Robert', 'Mary', 'William', 'Patricia']
+    def _scan_pii(self, text):
+        """Return (start, end, kind) spans of emails, IDs and phones"""
+        # Text without an '@' or a digit cannot match the built-in patterns
+        if self._prefilter_pii and '@' not in text and not _has_digit(text):
+            return []
+        if self._hyperscan_db is not None and text:
+            try:
+                return self._scan_pii_prefiltered(text)
+            except (UnicodeEncodeError, hyperscan.error):
+                # Unencodable text, or scratch space in use by another thread
+                pass
+        combined = self._combined
+        if self._combined_re2 is not None and text.isascii():
+            combined = self._combined_re2
+        return [(*m.span(), m.lastgroup) for m in combined.finditer(text)]
+
+    def _scan_pii_prefiltered(self, text):
+        """Return the spans of _scan_pii, searching only from Hyperscan candidates"""
+        data = text.encode('utf-8')
+        candidates = []
+        self._hyperscan_db.scan(
+            data,
+            match_event_handler=lambda _, start, end, flags, context: candidates.append((start, end)),
+            scratch=self._hyperscan_scratch
+        )
+        if len(data) != len(text):
+            candidates = _char_offsets(data, candidates)
         
-        for name in common_first_names:
-            # Replace standalone first names (not followed by known surnames)
-            text = re.sub(rf'\b{name}\b(?!\s+[A-Z])', file_identifier, text)
+        # Every real match lies inside a candidate, so searching from the
+        # first candidate that ends past the previous match finds the same
+        # matches as finditer without scanning the text in between
+        spans = []
+        position = 0
+        for start, end in sorted(candidates):
+            if end <= position:
+                continue
+            match = self._combined.search(text, max(position, start))
+            if match is None:
+                break
+            spans.append((*match.span(), match.lastgroup))
+            position = match.end()
+        return spans
+
+    def _scan_specific_names(self, text):
+        """Return (start, end, kind) spans of the specific known full names"""
+        lowered = text.lower()
+        if not any(lower in lowered for lower in self._specific_lower_names):
+            return []
+        # Other casings ("zoe w", "JOHN SMITH") are matched in the lowercased
+        # text, whose offsets are the same as long as lowercasing kept the
+        # length; exact-case names are found by plain substring search
+        if any(lowered.count(lower) != text.count(name)
+               for name, lower in zip(self.specific_names, self._specific_lower_names)):
+            if len(lowered) == len(text):
+                return [(*m.span(), 'name') for m in self._specific_lower_re.finditer(lowered)]
+            return [(*m.span(), 'name') for m in self._specific_names_re.finditer(text)]
+        spans = []
+        for name in self.specific_names:
+            start = text.find(name)
+            while start != -1:
+                spans.append((start, start + len(name), 'name'))
+                start = text.find(name, start + len(name))
+        return sorted(spans)
+
+    def _scan_common_names(self, text):
+        """Return (start, end, kind) spans of standalone first names"""
+        return [(*m.span(), 'name') for m in self._common_names_re.finditer(text)]
+
+    @staticmethod
+    def _merge_spans(accepted, spans):
+        """Merge sorted spans into sorted accepted ones, dropping any overlaps"""
+        merged = []
+        i = 0
+        for span in spans:
+            while i < len(accepted) and accepted[i][1] <= span[0]:
+                merged.append(accepted[i])
+                i += 1
+            if i < len(accepted) and accepted[i][0] < span[1]:
+                continue
+            if merged and merged[-1][1] > span[0]:
+                continue
+            merged.append(span)
+        merged.extend(accepted[i:])
+        return merged
+
+    def _scan(self, text, names_only=False):
+        """Return the non-overlapping spans to replace, in order of position"""
+        # Settings may have been changed since the patterns were compiled
+        if self._settings_snapshot() != self._compiled_settings:
+            self._compile_patterns()
         
-        return text
+        # Earlier kinds take precedence over later ones where they overlap:
+        # emails, IDs and phones, then full names, then first names
+        spans = [] if names_only else self._scan_pii(text)
+        for scan in (self._scan_specific_names, self._scan_common_names):
+            name_spans = scan(text)
+            if name_spans:
+                spans = self._merge_spans(spans, name_spans)
+        return spans
+
+    def _iter_replaced(self, text, spans, email_identifier, name_identifier):
+        """Yield the pieces of text with each span replaced, in order"""
+        position = 0
+        for start, end, kind in spans:
+            yield text[position:start]
+            if kind == 'name':
+                yield name_identifier
+            else:
+                yield self._replace_pii(kind, text[start:end], email_identifier)
+            position = end
+        yield text[position:]
+
+    def deidentify_names(self, text, file_identifier="Participant"):
+        """Replace specific names with anonymized versions using file identifier"""
+        spans = self._scan(text, names_only=True)
+        return ''.join(self._iter_replaced(text, spans, None, file_identifier))
 
-    def deidentify_ids(self, text):
+    def deidentify_ids(self, text, file_identifier="participant"):
         """Replace ID numbers and identifiers"""
-        def replace_id(match):
-            id_text = match.group(0)
-            if id_text not in self.id_mappings:
-                if 'ID:' in id_text:
-                    replacement = f"ID: {str(self.id_counter).zfill(6)}"
-                elif 'Mobile:' in id_text:
-                    replacement = f"Mobile: XXXX{str(self.id_counter).zfill(3)}"
-                else:
-                    replacement = f"ID_{self.id_counter}"
-                self.id_mappings[id_text] = replacement
-                self.id_counter += 1
-            return self.id_mappings[id_text]
-        
         for pattern in self.id_patterns:
-            text = pattern.sub(replace_id, text)
+            text = pattern.sub(
+                lambda match: self._replace_id(match.group(0), file_identifier), text
+            )
         return text
 
+    def _iter_deidentified(self, text, file_identifier):
+        """Yield the pieces of the deidentified text, in order"""
+        # Every kind of PII is located in the original text and the output
+        # is rebuilt in one pass, with no intermediate copies of the text
+        return self._iter_replaced(text, self._scan(text), file_identifier.lower(),
+                                   file_identifier.upper())
+
     def deidentify_text(self, text, file_identifier="participant"):
         """Apply all deidentification patterns to text"""
-        text = self.deidentify_emails(text, file_identifier.lower())
-        text = self.deidentify_phones(text)
-        text = self.deidentify_names(text, file_identifier.upper())
-        text = self.deidentify_ids(text)
-        return text
+        return ''.join(self._iter_deidentified(text, file_identifier))
 
     def process_file(self, file_path, output_dir=None, in_place=False):
         """Process a single markdown file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _read_text(file_path)
             
-            # Extract filename without extension to use as identifier
-            file_stem = Path(file_path).stem
-            # Remove "deidentified_" prefix if it exists
-            if file_stem.startswith('deidentified_'):
-                file_stem = file_stem[13:]
+            path = Path(file_path)
+            file_stem = _file_identifier(path)
             
-            deidentified_content = self.deidentify_text(content, file_stem)
+            pieces = self._iter_deidentified(content, file_stem)
             
             if in_place:
-                output_path = file_path
+                output_path = path
             elif output_dir:
-                output_path = Path(output_dir) / f"deidentified_{Path(file_path).name}"
+                output_path = Path(output_dir) / f"deidentified_{path.name}"
             else:
-                output_path = Path(file_path).parent / f"deidentified_{Path(file_path).name}"
+                output_path = path.parent / f"deidentified_{path.name}"
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(deidentified_content)
+            _write_pieces(output_path, pieces)
             
             logger.info(f"Processed: {file_path} -> {output_path}")
             return output_path
@@ -185,20 +506,50 @@ class PIIDeidentifier:
             output_dir = Path(output_dir)
             output_dir.mkdir(exist_ok=True)
         
-        markdown_files = list(directory.glob('*.md'))
+        # Directory entries carry their name and file type, so no Path
+        # objects or extra stat calls are needed to find the markdown files
+        with os.scandir(directory) as entries:
+            markdown_files = [entry.path for entry in entries
+                              if entry.name.endswith('.md') and entry.is_file()]
         if not markdown_files:
             logger.warning(f"No markdown files found in {directory}")
             return []
         
-        processed_files = []
-        for md_file in markdown_files:
-            result = self.process_file(md_file, output_dir, in_place)
-            if result:
-                processed_files.append(result)
+        # Files sharing an identifier share replacements, so they are
+        # processed together, in name order, by one worker; this numbers
+        # phones and IDs the same however the files are scheduled
+        groups = defaultdict(list)
+        for file_path in sorted(markdown_files):
+            groups[_file_identifier(Path(file_path))].append(file_path)
+        
+        # Groups are independent, so they are processed in parallel. Each
+        # worker rebuilds this instance's class and settings once.
+        settings = {name: getattr(self, name) for name in self._SETTINGS}
+        max_workers = min(len(groups), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                 initargs=(type(self), settings)) as executor:
+            results = executor.map(_process_group, groups.values(),
+                                   repeat(output_dir), repeat(in_place))
+            processed_files = [result for group in results for result in group if result]
         
         logger.info(f"Processed {len(processed_files)} files")
         return processed_files
 
+# The deidentifier shared by all files processed in a worker process
+_worker_deidentifier = None
+
+def _init_worker(deidentifier_class, settings):
+    """Build the worker's deidentifier from the parent instance's settings"""
+    global _worker_deidentifier
+    _worker_deidentifier = deidentifier_class()
+    vars(_worker_deidentifier).update(settings)
+    _worker_deidentifier._compile_patterns()
+
+def _process_group(file_paths, output_dir=None, in_place=False):
+    """Process files sharing an identifier, in order, in a worker process"""
+    return [_worker_deidentifier.process_file(file_path, output_dir, in_place)
+            for file_path in file_paths]
+
 def main():
     parser = argparse.ArgumentParser(description='Deidentify PII in markdown files')
     parser.add_argument('input_path', help='Input file or directory path')
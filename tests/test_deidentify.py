@@ -8,9 +8,11 @@ import tempfile
 import os
 from pathlib import Path
 import sys
+from unittest import mock
 
 # Add parent directory to path to import the main module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import deidentify_pii
 from deidentify_pii import PIIDeidentifier
 
 
@@ -37,6 +39,10 @@ class TestPIIDeidentifier(unittest.TestCase):
         self.assertNotIn("+61 2 1234 5678", result)
         self.assertNotIn("0412 345 678", result)
         self.assertIn("XXX", result)
+        
+        # Trailing digits of a long number are not left behind
+        result = self.deidentifier.deidentify_phones("Call +61 412345678901234 today", "testfile")
+        self.assertEqual(result, "Call +61 XXX XXX 001 today")
     
     def test_name_deidentification(self):
         """Test name replacement"""
@@ -47,6 +53,20 @@ class TestPIIDeidentifier(unittest.TestCase):
         self.assertNotIn("Zoe W", result)
         self.assertIn("TESTFILE", result)
     
+    def test_name_case_variants(self):
+        """Test that specific names are replaced regardless of case"""
+        text = "zoe w spoke to JOHN SMITH"
+        result = self.deidentifier.deidentify_names(text, "TESTFILE")
+        
+        self.assertEqual(result, "TESTFILE spoke to TESTFILE")
+    
+    def test_name_followed_by_email(self):
+        """Test that a capitalised email does not count as a surname"""
+        text = "Contact Zoe Zoe.W@gmail.com"
+        result = self.deidentifier.deidentify_text(text, "testfile")
+        
+        self.assertEqual(result, "Contact TESTFILE testfile@gmail.com")
+    
     def test_id_deidentification(self):
         """Test ID number replacement"""
         text = "ID: 123456 and Mobile: 0412345678"
@@ -54,6 +74,70 @@ class TestPIIDeidentifier(unittest.TestCase):
         
         self.assertNotIn("123456", result)
         self.assertIn("000001", result)
+        self.assertIn("Mobile: XXXX002", result)
+    
+    def test_ids_take_precedence_over_phones(self):
+        """Test that numbers after an ID label are replaced as IDs"""
+        text = "ID: 123456789\nMobile: 0412 345 678"
+        result = self.deidentifier.deidentify_text(text, "testfile")
+        
+        self.assertEqual(result, "ID: 000001\nMobile: XXXX002")
+    
+    @unittest.skipUnless(deidentify_pii.re2, "google-re2 is not installed")
+    def test_re2_matches_stdlib(self):
+        """Test that the RE2 scan gives the same output as the stdlib one"""
+        with mock.patch.object(deidentify_pii, 'hyperscan', None):
+            re2_deidentifier = PIIDeidentifier()
+            with mock.patch.object(deidentify_pii, 're2', None):
+                re_deidentifier = PIIDeidentifier()
+        
+        for text in ("Mobile: \u0664\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668",
+                     "Email jos\u00e9.garcia@gmail.com",
+                     "Call 0412\x1c345\x0b678 or +61 2 1234 5678, ID: 42"):
+            self.assertEqual(re2_deidentifier.deidentify_text(text, "testfile"),
+                             re_deidentifier.deidentify_text(text, "testfile"))
+    
+    @unittest.skipUnless(deidentify_pii.hyperscan, "hyperscan is not installed")
+    def test_hyperscan_instances_in_threads(self):
+        """Test that separate instances can scan with Hyperscan concurrently"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        text = "Email jane@gmail.com or call 0412 345 678\n" * 1000
+        expected = "Email testfile@gmail.com or call 0XXX XXX 001\n" * 1000
+        
+        def deidentify(_):
+            return PIIDeidentifier().deidentify_text(text, "testfile")
+        
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(deidentify, range(16)))
+        
+        self.assertEqual(results, [expected] * 16)
+        
+        # Candidates include the separators the stdlib counts as whitespace
+        result = PIIDeidentifier().deidentify_text("ID:\x1c42", "testfile")
+        self.assertEqual(result, "ID: 000001")
+    
+    def test_custom_pii_kind(self):
+        """Test that a custom kind is replaced in text without '@' or digits"""
+        import re
+        
+        class SecretDeidentifier(PIIDeidentifier):
+            def _pii_alternatives(self):
+                # The pattern's flags carry over into the combined scan
+                secret_pattern = re.compile(r'\bsecret-[a-z]+\b', re.IGNORECASE)
+                return super()._pii_alternatives() + [('secret', secret_pattern)]
+            
+            def _replace_pii(self, kind, value, file_identifier):
+                if kind == 'secret':
+                    return 'SECRET'
+                return super()._replace_pii(kind, value, file_identifier)
+        
+        deidentifier = SecretDeidentifier()
+        
+        self.assertEqual(deidentifier.deidentify_text("code SECRET-ABC here", "testfile"),
+                         "code SECRET here")
+        self.assertEqual(deidentifier.deidentify_text("code SECRET-ABC here 1", "testfile"),
+                         "code SECRET here 1")
     
     def test_consistent_mapping(self):
         """Test that same PII gets same replacement"""
@@ -73,6 +157,16 @@ class TestPIIDeidentifier(unittest.TestCase):
         self.assertIsNotNone(match2)
         self.assertEqual(match1.group(), match2.group())
     
+    def test_mappings_per_file_identifier(self):
+        """Test that each file identifier gets its own replacements"""
+        text = "Email jane@example.com or call 0412 345 678"
+        
+        result1 = self.deidentifier.deidentify_text(text, "P01")
+        result2 = self.deidentifier.deidentify_text(text, "P02")
+        
+        self.assertEqual(result1, "Email p01@example.com or call 0XXX XXX 001")
+        self.assertEqual(result2, "Email p02@example.com or call 0XXX XXX 001")
+    
     def test_full_deidentification(self):
         """Test complete deidentification process"""
         text = """
@@ -130,6 +224,67 @@ class TestPIIDeidentifier(unittest.TestCase):
             # Clean up temp file
             os.unlink(temp_file)
     
+    def test_directory_processing(self):
+        """Test processing of every markdown file in a directory"""
+        with tempfile.TemporaryDirectory() as input_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            for name in ("P01.md", "P02.md"):
+                with open(os.path.join(input_dir, name), 'w') as f:
+                    f.write("Email: jane@example.com\nPhone: 0412 123 456\n")
+            
+            output_files = self.deidentifier.process_directory(input_dir, output_dir)
+            
+            self.assertEqual(len(output_files), 2)
+            for output_file in output_files:
+                self.assertIsInstance(output_file, Path)
+            for name in ("P01", "P02"):
+                with open(os.path.join(output_dir, f"deidentified_{name}.md"), 'r') as f:
+                    content = f.read()
+                self.assertIn(f"{name.lower()}@example.com", content)
+                self.assertNotIn("0412 123 456", content)
+    
+    def test_directory_processing_shared_identifier(self):
+        """Test that files sharing an identifier are numbered in name order"""
+        with tempfile.TemporaryDirectory() as input_dir, \
+                tempfile.TemporaryDirectory() as output_dir:
+            for name, phone in (("P01.md", "0412 123 456"),
+                                ("deidentified_P01.md", "0498 765 432"),
+                                ("P02.md", "0412 123 456")):
+                with open(os.path.join(input_dir, name), 'w') as f:
+                    f.write(f"Phone: {phone}\n")
+            
+            self.deidentifier.process_directory(input_dir, output_dir)
+            
+            for name, expected in (("deidentified_P01.md", "Phone: 0XXX XXX 001\n"),
+                                   ("deidentified_deidentified_P01.md", "Phone: 0XXX XXX 002\n"),
+                                   ("deidentified_P02.md", "Phone: 0XXX XXX 001\n")):
+                with open(os.path.join(output_dir, name), 'r') as f:
+                    self.assertEqual(f.read(), expected)
+    
+    def test_changed_settings_apply_to_every_path(self):
+        """Test that changed settings apply to text, files and directories alike"""
+        self.deidentifier.common_names = self.deidentifier.common_names + ['Alice']
+        self.deidentifier.specific_names['Bob Jones'] = 'Participant E'
+        
+        result = self.deidentifier.deidentify_text("Alice met Bob Jones\n", "P01")
+        self.assertEqual(result, "P01 met P01\n")
+        
+        with tempfile.TemporaryDirectory() as input_dir:
+            with open(os.path.join(input_dir, "P01.md"), 'w') as f:
+                f.write("Alice met Bob Jones\n")
+            
+            output_files = self.deidentifier.process_directory(input_dir)
+            
+            self.assertEqual(len(output_files), 1)
+            with open(output_files[0], 'r') as f:
+                self.assertEqual(f.read(), result)
+            
+            output_files = self.deidentifier.process_directory(input_dir, in_place=True)
+            
+            self.assertIn(Path(input_dir) / "P01.md", output_files)
+            for output_file in output_files:
+                self.assertIsInstance(output_file, Path)
+    
     def test_markdown_preservation(self):
         """Test that markdown formatting is preserved"""
         text = """